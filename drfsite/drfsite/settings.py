@@ -48,11 +48,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'maker.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'maker.middleware.RateLimitHeadersMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -146,8 +148,61 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Сколько прокси стоит перед приложением. 0 — IP берётся из REMOTE_ADDR, а
+    # X-Forwarded-For от клиента игнорируется (иначе лимиты по IP обходятся подменой
+    # заголовка). За балансировщиком укажите реальное число прокси.
+    'NUM_PROXIES': 0,
+    # Token bucket по пользователю и по IP (maker.throttling). Ставка ищется по ключу
+    # "<throttle_scope представления>.<user|ip>", иначе берётся общая "user"/"ip".
+    'DEFAULT_THROTTLE_CLASSES': (
+        'maker.throttling.UserTokenBucketThrottle',
+        'maker.throttling.IPTokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'user': '1000/hour',
+        'ip': '2000/hour',
+        'link_create.user': '30/min',
+        'link_create.ip': '60/min',
+        'auth.ip': '10/min',
+        'register.ip': '5/min',
+        'password_reset.ip': '5/min',
+    },
+    # FastJSONRenderer использует orjson, если он установлен, иначе стандартный json
+    'DEFAULT_RENDERER_CLASSES': (
+        'maker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+# Ограничения хранятся в кеше; для общих лимитов между процессами нужен
+# разделяемый кеш (Redis/Memcached) вместо локального
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
 }
 
+# Не больше стольких одновременных запросов fetch_link_data; сверх лимита — 429
+OUTBOUND_FETCH_MAX_CONCURRENCY = 20
+OUTBOUND_FETCH_RETRY_AFTER = 5
+OUTBOUND_FETCH_SLOT_TTL = 60
+
+# Массовое создание пользователей (maker.provisioning): число процессов для
+# хеширования паролей в команде provision_users (None — по числу CPU) и лимит
+# строк на один API-запрос. API хеширует в своём потоке, поэтому открытых паролей
+# за запрос берёт столько, сколько укладывается в бюджет времени (в секундах)
+PROVISIONING_HASH_WORKERS = None
+PROVISIONING_MAX_ROWS_PER_REQUEST = 5000
+PROVISIONING_REQUEST_TIME_BUDGET = 30
+
+# Сжатие ответов (maker.middleware.CompressionMiddleware); brotli — если установлен пакет brotli
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Сколько дней хранить журнал изменений для /api/sync/ (см. compact_changelog)
+SYNC_CHANGELOG_RETENTION_DAYS = 30
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -16,7 +16,7 @@ Including another URLconf
 """
 from django.urls import include, path
 from django.contrib import admin
-from maker.views import ChangePasswordView, CustomTokenObtainPairView, LinkView, CollectionView, PasswordResetConfirmView, PasswordResetView, RegisterView
+from maker.views import ChangePasswordView, CustomTokenObtainPairView, LinkView, LinkLookupView, CollectionView, CollectionSummaryView, PasswordResetConfirmView, PasswordResetView, RegisterView, SyncView, ThrottlingStatusView, UserProvisioningView
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -43,6 +43,8 @@ urlpatterns = [
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('api/', include([
         path('register/', RegisterView.as_view(), name='register'),
+        path('admin/users/import/', UserProvisioningView.as_view(), name='user-import'),
+        path('admin/throttling/', ThrottlingStatusView.as_view(), name='throttling-status'),
         path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
         path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
         path('auth/change-password/', ChangePasswordView.as_view(), name='change-password'),
@@ -50,7 +52,10 @@ urlpatterns = [
         path('auth/reset-password/<uidb64>/<token>/', PasswordResetConfirmView.as_view(), name='password-reset-confirm'),
         path('links/', LinkView.as_view(), name='link-list'),
         path('links/<int:pk>/', LinkView.as_view(), name='link-detail'),
+        path('links/lookup/', LinkLookupView.as_view(), name='link-lookup'),
         path('collections/', CollectionView.as_view(), name='collection-list'),
         path('collections/<int:pk>/', CollectionView.as_view(), name='collection-detail'),
+        path('collections/summary/', CollectionSummaryView.as_view(), name='collection-summary'),
+        path('sync/', SyncView.as_view(), name='sync'),
     ])),
 ]
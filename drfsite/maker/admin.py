@@ -1,5 +1,132 @@
 from django.contrib import admin
-from .models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import ChangeLog, Collection, Link, User
 
 
-admin.site.register(User)
\ No newline at end of file
+ACTION_BATCH_SIZE = 1000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для списка без фильтров берёт оценку числа строк из статистики БД
+    вместо COUNT(*) по всей таблице. Маленькие таблицы и отфильтрованные
+    выборки считаются точно.
+
+    Статистику собирает ANALYZE (команда analyze_db): на SQLite без неё
+    оценки нет и всегда выполняется COUNT(*), поэтому команду стоит
+    запускать по расписанию вместе с compact_changelog.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self.estimate(self.object_list)
+            if estimate is not None and estimate > self.exact_count_threshold:
+                return estimate
+        return super().count
+
+    def estimate(self, queryset):
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            elif connection.vendor == 'sqlite':
+                # sqlite_stat1 создаётся командой ANALYZE; первое число в stat — число строк.
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+        if not row or row[0] is None:
+            return None
+        return int(str(row[0]).split()[0])
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_per_page = 50
+
+    def get_actions(self, request):
+        # Стандартный delete_selected выводит на странице подтверждения все выбранные
+        # объекты и удаляет их по одному через Collector — на больших таблицах это неприемлемо.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+
+def make_set_link_type_action(link_type, label):
+    def action(modeladmin, request, queryset):
+        # UPDATE пачками по id вместо save() по каждой строке; сигналы при этом не срабатывают,
+        # поэтому журнал синхронизации пишется вручную.
+        updated, last_pk = 0, 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk').values_list('id', 'user_id')[:ACTION_BATCH_SIZE]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            updated += Link.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                link_type=link_type, updated_at=timezone.now()
+            )
+            by_user = {}
+            for pk, user_id in rows:
+                by_user.setdefault(user_id, []).append(pk)
+            for user_id, ids in by_user.items():
+                ChangeLog.objects.record(user_id, ChangeLog.ENTITY_LINK, ChangeLog.ACTION_UPDATED, ids)
+        modeladmin.message_user(request, f'Обновлено ссылок: {updated}')
+
+    action.__name__ = f'set_link_type_{link_type}'
+    return admin.action(description=f'Сменить тип на «{label}»')(action)
+
+
+@admin.register(Link)
+class LinkAdmin(ScalableModelAdmin):
+    list_display = ('id', 'title', 'url', 'link_type', 'user', 'created_at')
+    list_filter = ('link_type', 'created_at')
+    raw_id_fields = ('user',)
+    actions = [make_set_link_type_action(value, label) for value, label in Link.TYPE_CHOICES]
+
+
+@admin.register(Collection)
+class CollectionAdmin(ScalableModelAdmin):
+    list_display = ('id', 'name', 'user', 'created_at', 'updated_at')
+    list_filter = ('created_at',)
+    raw_id_fields = ('user', 'links')
+    actions = ['clear_links']
+
+    @admin.action(description='Убрать все ссылки из коллекций')
+    def clear_links(self, request, queryset):
+        # Как и смена типа ссылок: читаем и удаляем связи пачками по id, чтобы не держать
+        # в памяти все выбранные связи разом.
+        through = Collection.links.through.objects.filter(collection__in=queryset)
+        deleted, last_pk = 0, 0
+        while True:
+            rows = list(
+                through.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('id', 'collection_id', 'link_id', 'collection__user_id')[:ACTION_BATCH_SIZE]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            batch_deleted, _ = Collection.links.through.objects.filter(pk__in=[row[0] for row in rows]).delete()
+            deleted += batch_deleted
+            ChangeLog.objects.bulk_create([
+                ChangeLog(user_id=user_id, entity=ChangeLog.ENTITY_MEMBERSHIP, action=ChangeLog.ACTION_DELETED,
+                          object_id=link_id, collection_id=collection_id)
+                for _, collection_id, link_id, user_id in rows
+            ])
+        self.message_user(request, f'Удалено связей: {deleted}')
+
+
+admin.site.register(User)
@@ -0,0 +1,60 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from maker.middleware import brotli
+from maker.models import Link
+from maker.renderers import FastJSONRenderer, orjson
+from maker.serializers import LinkSerializer
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время рендеринга JSON и размер ответа со сжатием для списка ссылок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Количество ссылок в ответе.')
+        parser.add_argument('--repeat', type=int, default=5, help='Сколько раз повторить замер.')
+
+    def handle(self, *args, **options):
+        # Объекты не сохраняются в БД: замеряем только сериализацию и рендеринг.
+        now = timezone.now()
+        links = [
+            Link(
+                id=i, user_id=1, title=f'Заголовок ссылки {i}',
+                description='Описание страницы из Open Graph. ' * 4,
+                url=f'https://example.com/articles/{i}/', image=f'https://example.com/images/{i}.png',
+                link_type='article', created_at=now, updated_at=now,
+            )
+            for i in range(options['count'])
+        ]
+
+        started = time.perf_counter()
+        data = LinkSerializer(links, many=True).data
+        self.stdout.write(f'LinkSerializer: {(time.perf_counter() - started) * 1000:.1f} мс')
+
+        renderers = [('JSONRenderer', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('FastJSONRenderer (orjson)', FastJSONRenderer()))
+        else:
+            self.stdout.write('orjson не установлен, FastJSONRenderer использует стандартный json.')
+
+        for name, renderer in renderers:
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                body = renderer.render(data, 'application/json')
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f'{name}: {min(timings) * 1000:.1f} мс (лучшее из {options["repeat"]}), {len(body)} байт'
+            )
+
+        started = time.perf_counter()
+        size = len(gzip.compress(body, compresslevel=6))
+        self.stdout.write(f'gzip (6): {size} байт, {(time.perf_counter() - started) * 1000:.1f} мс')
+        if brotli is not None:
+            started = time.perf_counter()
+            size = len(brotli.compress(body, quality=5))
+            self.stdout.write(f'brotli (5): {size} байт, {(time.perf_counter() - started) * 1000:.1f} мс')
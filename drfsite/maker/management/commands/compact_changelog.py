@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from maker.models import ChangeLog
+
+
+class Command(BaseCommand):
+    help = 'Удаляет записи журнала синхронизации старше срока хранения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'SYNC_CHANGELOG_RETENTION_DAYS', 30),
+            help='Срок хранения записей в днях.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько записей удалять за один DELETE.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        boundary = (
+            ChangeLog.objects.filter(created_at__lt=cutoff)
+            .order_by('-id').values_list('id', flat=True).first()
+        )
+        latest = ChangeLog.objects.order_by('-id').values_list('id', flat=True).first()
+        if boundary is None:
+            self.stdout.write('Нечего удалять.')
+            return
+
+        # Последняя запись остаётся всегда: по минимальному id SyncView
+        # определяет, что курсор клиента устарел.
+        boundary = min(boundary, latest - 1)
+        oldest = ChangeLog.objects.order_by('id').values_list('id', flat=True).first()
+        deleted = 0
+        # Удаляем префикс журнала диапазонами id, чтобы не держать длинную блокировку.
+        for start in range(oldest, boundary + 1, options['batch_size']):
+            end = min(start + options['batch_size'] - 1, boundary)
+            count, _ = ChangeLog.objects.filter(id__gte=start, id__lte=end).delete()
+            deleted += count
+
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей журнала: {deleted}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from maker.provisioning import Provisioner, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Массово создаёт пользователей из CSV или NDJSON (username, email, password или password_hash).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с пользователями.')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Формат файла; по умолчанию по расширению.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Сколько пользователей вставлять за транзакцию.')
+        parser.add_argument('--workers', type=int, help='Число процессов для хеширования паролей.')
+        parser.add_argument('--start-row', type=int, default=0, help='С какой строки продолжить прерванную загрузку.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        if options['start_row'] < 0:
+            raise CommandError('--start-row must be non-negative.')
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be positive.')
+        fmt = options['format'] or detect_format(options['path'])
+
+        def report(stats):
+            self.stdout.write(
+                f"Строк обработано до {stats['next_row']}: создано {stats['created']}, "
+                f"пропущено {stats['skipped']}, ошибок {len(stats['errors'])}"
+            )
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                with Provisioner(chunk_size=options['chunk_size'], workers=options['workers']) as provisioner:
+                    stats = provisioner.run(read_rows(stream, fmt), start=options['start_row'], on_chunk=report)
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(e)
+
+        for error in stats['errors']:
+            self.stderr.write(f"Строка {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: создано {stats['created']}, пропущено существующих {stats['skipped']}, "
+            f"ошибок {len(stats['errors'])}"
+        ))
@@ -0,0 +1,112 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    """Возвращает {кодировка: q} из заголовка Accept-Encoding."""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы в brotli или gzip в зависимости от Accept-Encoding.
+
+    Сжимаются только JSON-ответы API: HTML админки и браузерного API содержит
+    CSRF-токен рядом с данными из запроса и уязвим для BREACH. Ответы короче
+    COMPRESSION_MIN_SIZE байт и потоковые ответы не сжимаются. brotli
+    используется, только если установлен пакет `brotli`.
+    """
+    compressible_types = ('application/json',)
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def select_encoding(self, header):
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get('*', 0.0)
+        supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+        best, best_q = None, 0.0
+        # При равных q предпочитаем brotli: он идёт первым в списке.
+        for encoding in supported:
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return gzip.compress(content, compresslevel=self.gzip_level)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.compressible_types:
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = self.compress(encoding, response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+
+        # Сильный ETag после сжатия становится слабым (RFC 9110, 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Добавляет заголовки X-RateLimit-* по самому строгому из сработавших
+    ограничений (их состояние записывают throttle-классы из maker.throttling).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limits = getattr(request, 'rate_limits', None)
+        if rate_limits:
+            strictest = min(rate_limits, key=lambda status: status['remaining'])
+            response.headers['X-RateLimit-Scope'] = strictest['scope']
+            response.headers['X-RateLimit-Limit'] = str(strictest['limit'])
+            response.headers['X-RateLimit-Remaining'] = str(strictest['remaining'])
+        return response
@@ -39,8 +39,8 @@ class Link(models.Model):
     description = models.TextField(blank=True, null=True)
     url = models.URLField(unique=True)
     image = models.URLField(blank=True, null=True)
-    link_type = models.CharField(max_length=50, choices=TYPE_CHOICES, default='website')
-    created_at = models.DateTimeField(auto_now_add=True)
+    link_type = models.CharField(max_length=50, choices=TYPE_CHOICES, default='website', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
 
@@ -49,5 +49,66 @@ class Collection(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     links = models.ManyToManyField(Link, related_name='collections', blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ChangeLogManager(models.Manager):
+    def record(self, user_id, entity, action, object_ids, collection_id=None):
+        """Пишет по одной записи журнала на каждый id одним INSERT."""
+        self.bulk_create([
+            self.model(
+                user_id=user_id,
+                entity=entity,
+                action=action,
+                object_id=object_id,
+                collection_id=collection_id,
+            )
+            for object_id in object_ids
+        ])
+
+
+class ChangeLog(models.Model):
+    """
+    Журнал изменений для инкрементальной синхронизации клиентов.
+
+    Монотонно растущий `id` записи служит курсором синхронизации.
+    Для удалённых объектов запись остаётся "надгробием" до очистки
+    командой `compact_changelog`.
+    """
+    ENTITY_LINK = 'link'
+    ENTITY_COLLECTION = 'collection'
+    ENTITY_MEMBERSHIP = 'membership'
+    ENTITY_CHOICES = [
+        (ENTITY_LINK, 'Link'),
+        (ENTITY_COLLECTION, 'Collection'),
+        (ENTITY_MEMBERSHIP, 'Membership'),
+    ]
+
+    ACTION_CREATED = 'created'
+    ACTION_UPDATED = 'updated'
+    ACTION_DELETED = 'deleted'
+    ACTION_CHOICES = [
+        (ACTION_CREATED, 'Created'),
+        (ACTION_UPDATED, 'Updated'),
+        (ACTION_DELETED, 'Deleted'),
+    ]
+
+    # Без ограничения на уровне БД: при каскадном удалении пользователя
+    # post_delete для его ссылок пишет записи уже после сбора каскада.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='changes',
+                             db_constraint=False, db_index=False)
+    entity = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    # Для membership object_id — id ссылки, collection_id — id коллекции.
+    object_id = models.BigIntegerField()
+    collection_id = models.BigIntegerField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ChangeLogManager()
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id'], name='maker_changelog_user_cursor'),
+        ]
@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+
+User = get_user_model()
+
+FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+def read_rows(stream, fmt):
+    """Читает пользователей из текстового потока CSV (с заголовком) или NDJSON, по словарю на строку."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'ndjson':
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def detect_format(filename):
+    return 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+
+
+@lru_cache(maxsize=None)
+def _hash_cost(algorithm, iterations):
+    # Аргументы нужны только как ключ кеша: замер повторяется при смене хешера.
+    hasher = get_hasher()
+    started = time.perf_counter()
+    hasher.encode('provisioning-benchmark', hasher.salt())
+    return time.perf_counter() - started
+
+
+def request_hash_limit():
+    """
+    Сколько паролей можно захешировать за один API-запрос, чтобы уложиться
+    в PROVISIONING_REQUEST_TIME_BUDGET секунд. Стоимость хеша замеряется один
+    раз на процесс для текущего хешера (PBKDF2 по умолчанию — десятые доли секунды).
+    """
+    budget = getattr(settings, 'PROVISIONING_REQUEST_TIME_BUDGET', 30)
+    hasher = get_hasher()
+    cost = _hash_cost(hasher.algorithm, getattr(hasher, 'iterations', None))
+    return max(1, int(budget / max(cost, 1e-6)))
+
+
+def _needs_hash(row):
+    return isinstance(row, dict) and not row.get('password_hash')
+
+
+def _init_worker():
+    # При старте процессов через spawn (macOS, Windows) Django в воркере не настроен.
+    if not apps.ready:
+        django.setup()
+
+
+class Provisioner:
+    """
+    Массовое создание пользователей.
+
+    Пароли хешируются в пуле процессов (PBKDF2 упирается в CPU), конфликты
+    username/email ищутся двумя запросами IN на пачку, вставка — bulk_create
+    пачками по chunk_size в отдельной транзакции. Уже существующие
+    пользователи пропускаются, поэтому повторный запуск на том же файле
+    безопасен, а start позволяет продолжить с номера строки.
+    """
+
+    def __init__(self, chunk_size=1000, workers=None):
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive.')
+        self.chunk_size = chunk_size
+        if workers is None:
+            workers = getattr(settings, 'PROVISIONING_HASH_WORKERS', None)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def hash_passwords(self, passwords):
+        if not passwords:
+            return []
+        if self.pool is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self.pool.map(make_password, passwords, chunksize=chunksize))
+
+    def run(self, rows, start=0, limit=None, max_hashes=None, on_chunk=None):
+        """
+        Создаёт пользователей из `rows`, пропуская первые `start` строк.
+
+        Обрабатывает не больше `limit` строк и останавливается, как только
+        набралось `max_hashes` строк с открытым паролем (строки с готовым
+        password_hash этот лимит не расходуют). Возвращает статистику с
+        `next_row` — с этой строки можно продолжить — и `done`, если строки кончились.
+        """
+        if start < 0:
+            raise ValueError('start must be non-negative.')
+        stats = {'created': 0, 'skipped': 0, 'errors': [], 'next_row': start, 'done': False}
+        rows = islice(enumerate(rows), start, None if limit is None else start + limit)
+        hashes_left = max_hashes
+        while True:
+            chunk, exhausted = [], True
+            for item in rows:
+                chunk.append(item)
+                if hashes_left is not None and _needs_hash(item[1]):
+                    hashes_left -= 1
+                if len(chunk) >= self.chunk_size or hashes_left == 0:
+                    exhausted = False
+                    break
+            if chunk:
+                self.provision_chunk(chunk, stats)
+                stats['next_row'] = chunk[-1][0] + 1
+                if on_chunk is not None:
+                    on_chunk(stats)
+            if exhausted:
+                # Срез по limit мог оборвать данные — тогда они не кончились.
+                stats['done'] = limit is None or stats['next_row'] - start < limit
+                break
+            if hashes_left == 0:
+                break
+        return stats
+
+    def provision_chunk(self, chunk, stats):
+        candidates = []
+        for row_number, row in chunk:
+            error = self.validate(row)
+            if error:
+                stats['errors'].append({'row': row_number, 'error': error})
+                continue
+            candidates.append((row_number, row))
+
+        usernames = {row['username'] for _, row in candidates}
+        emails = {row['email'] for _, row in candidates}
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+        accepted = []
+        for row_number, row in candidates:
+            if row['username'] in taken_usernames or row['email'] in taken_emails:
+                stats['skipped'] += 1
+                continue
+            # Дубликаты внутри самого файла: первая строка выигрывает.
+            taken_usernames.add(row['username'])
+            taken_emails.add(row['email'])
+            accepted.append(row)
+
+        plain = [row for row in accepted if not row.get('password_hash')]
+        for row, hashed in zip(plain, self.hash_passwords([row['password'] for row in plain])):
+            row['password_hash'] = hashed
+
+        users = [
+            User(password=row['password_hash'], **{field: row.get(field) or '' for field in FIELDS})
+            for row in accepted
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=self.chunk_size)
+        stats['created'] += len(users)
+
+    def validate(self, row):
+        if not isinstance(row, dict):
+            return 'Row must be a JSON object.'
+        for field in FIELDS + ('password', 'password_hash'):
+            value = row.get(field)
+            if value is not None and not isinstance(value, str):
+                return f'{field} must be a string.'
+
+        row['username'] = (row.get('username') or '').strip()
+        row['email'] = User.objects.normalize_email((row.get('email') or '').strip())
+        if not row['username'] or not row['email']:
+            return 'username and email are required.'
+        if row.get('password_hash'):
+            # Готовый хеш (например, при миграции) принимаем только в формате известного хешера.
+            try:
+                identify_hasher(row['password_hash'])
+            except ValueError:
+                return 'password_hash has unknown format.'
+        elif not row.get('password'):
+            return 'password or password_hash is required.'
+
+        # Валидаторы полей модели (max_length, UnicodeUsernameValidator, EmailValidator):
+        # bulk_create их не вызывает, а на Postgres слишком длинное значение оборвало бы всю пачку.
+        user = User(password=row.get('password_hash') or '', **{field: row.get(field) or '' for field in FIELDS})
+        exclude = [] if row.get('password_hash') else ['password']
+        try:
+            user.clean_fields(exclude=exclude)
+        except ValidationError as e:
+            return '; '.join(
+                f'{field}: {" ".join(messages)}' for field, messages in sorted(e.message_dict.items())
+            )
+        return None
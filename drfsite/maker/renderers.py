@@ -0,0 +1,37 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson с откатом на стандартный JSONRenderer DRF.
+
+    orjson сам сериализует datetime/date/uuid и dict/list с наследниками
+    (ReturnDict, ErrorDetail); всё остальное (Decimal, ленивые строки,
+    QuerySet) передаётся кодировщику DRF. Форматированный вывод
+    (`indent`, браузерный API) всегда рендерится стандартным способом.
+    """
+    default_encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.default_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+        # Как и JSONRenderer, экранируем U+2028/U+2029, чтобы вывод оставался подмножеством JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -1,5 +1,46 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from .models import Link, Collection
+from .utils import normalize_url
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Проверяет весь список id одним запросом вместо запроса на каждый элемент."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+            try:
+                pks.append(pk_field.to_python(item))
+            except (DjangoValidationError, TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        objects = queryset.in_bulk(set(pks))
+        for pk in pks:
+            if pk not in objects:
+                child.fail('does_not_exist', pk_value=pk)
+        return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
 
 
 class LinkSerializer(serializers.ModelSerializer):
@@ -7,9 +48,12 @@ class LinkSerializer(serializers.ModelSerializer):
         model = Link
         fields = '__all__'
 
+    def validate_url(self, value):
+        return normalize_url(value)
+
 
 class CollectionSerializer(serializers.ModelSerializer):
-    links = serializers.PrimaryKeyRelatedField(
+    links = BulkPrimaryKeyRelatedField(
         queryset=Link.objects.all(), many=True, required=False
     )
 
@@ -21,5 +65,23 @@ class CollectionSerializer(serializers.ModelSerializer):
         links = validated_data.pop('links', [])
         user = self.context['request'].user
         collection = Collection.objects.create(user=user, **validated_data)
-        collection.links.set(links)
-        return collection
\ No newline at end of file
+        # Коллекция новая, сравнивать с текущим составом, как делает set(), не нужно.
+        collection.links.add(*links)
+        return collection
+
+
+class LinkPreviewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Link
+        fields = ['id', 'title', 'image']
+
+
+class CollectionSummarySerializer(serializers.ModelSerializer):
+    # Поля ниже заполняются аннотациями и Prefetch(to_attr=...) в CollectionSummaryView.
+    link_count = serializers.IntegerField(read_only=True)
+    last_updated = serializers.DateTimeField(read_only=True)
+    preview_links = LinkPreviewSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Collection
+        fields = ['id', 'name', 'description', 'link_count', 'last_updated', 'preview_links', 'created_at']
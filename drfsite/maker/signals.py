@@ -0,0 +1,65 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import ChangeLog, Collection, Link
+
+
+# QuerySet.update()/bulk_create() сигналы не вызывают — такие места
+# должны сами писать в журнал через ChangeLog.objects.record().
+
+@receiver(post_save, sender=Link)
+@receiver(post_save, sender=Collection)
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    entity = ChangeLog.ENTITY_LINK if sender is Link else ChangeLog.ENTITY_COLLECTION
+    action = ChangeLog.ACTION_CREATED if created else ChangeLog.ACTION_UPDATED
+    ChangeLog.objects.record(instance.user_id, entity, action, [instance.pk])
+
+
+@receiver(post_delete, sender=Link)
+@receiver(post_delete, sender=Collection)
+def log_delete(sender, instance, **kwargs):
+    entity = ChangeLog.ENTITY_LINK if sender is Link else ChangeLog.ENTITY_COLLECTION
+    ChangeLog.objects.record(instance.user_id, entity, ChangeLog.ACTION_DELETED, [instance.pk])
+
+
+@receiver(pre_delete, sender=Link)
+def log_link_memberships_delete(sender, instance, **kwargs):
+    # Каскад удаляет строки связи без m2m_changed; владельцу чужой коллекции
+    # иначе не узнать, что ссылка из неё пропала.
+    memberships = Collection.links.through.objects.filter(link_id=instance.pk)
+    ChangeLog.objects.bulk_create([
+        ChangeLog(user_id=user_id, entity=ChangeLog.ENTITY_MEMBERSHIP, action=ChangeLog.ACTION_DELETED,
+                  object_id=instance.pk, collection_id=collection_id)
+        for collection_id, user_id in memberships.values_list('collection_id', 'collection__user_id')
+    ])
+
+
+@receiver(m2m_changed, sender=Collection.links.through)
+def log_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        log_action = ChangeLog.ACTION_CREATED
+    elif action in ('post_remove', 'pre_clear'):
+        log_action = ChangeLog.ACTION_DELETED
+    else:
+        return
+
+    if action == 'pre_clear':
+        # После очистки состав связи уже не восстановить, поэтому читаем его заранее.
+        related = instance.collections if reverse else instance.links
+        pk_set = set(related.values_list('pk', flat=True))
+    if not pk_set:
+        return
+
+    if reverse:
+        # instance — ссылка, pk_set — id коллекций; запись пишется владельцу коллекции.
+        owners = Collection.objects.filter(pk__in=pk_set).values_list('pk', 'user_id')
+        ChangeLog.objects.bulk_create([
+            ChangeLog(user_id=user_id, entity=ChangeLog.ENTITY_MEMBERSHIP, action=log_action,
+                      object_id=instance.pk, collection_id=collection_id)
+            for collection_id, user_id in owners
+        ])
+    else:
+        ChangeLog.objects.record(instance.user_id, ChangeLog.ENTITY_MEMBERSHIP, log_action,
+                                 pk_set, collection_id=instance.pk)
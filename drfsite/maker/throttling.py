@@ -0,0 +1,162 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+logger = logging.getLogger(__name__)
+
+OUTBOUND_FETCH_KEY = 'outbound_fetch_inflight'
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+
+    Ставка "N/период" задаёт ёмкость корзины N и скорость пополнения
+    N токенов за период, то есть допускает всплеск до N запросов.
+    Ставка ищется в DEFAULT_THROTTLE_RATES по ключу "<throttle_scope>.<kind>"
+    (throttle_scope — атрибут представления, строка или словарь по HTTP-методу),
+    а если его нет — по ключу "<kind>". Состояние корзины хранится в кеше Django.
+
+    Чтение и запись корзины выполняются под блокировкой (cache.add), иначе
+    параллельные запросы читали бы одно и то же число токенов и проходили сверх
+    лимита. Если блокировку не удалось взять за lock_wait секунд, запрос отклоняется.
+    """
+    kind = None
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    # Срок жизни блокировки страхует от процесса, упавшего между add() и delete().
+    lock_timeout = 2
+    lock_wait = 0.5
+    lock_poll_interval = 0.005
+
+    def __init__(self):
+        # Ставка зависит от представления и определяется в allow_request.
+        pass
+
+    def get_ident_for(self, request):
+        raise NotImplementedError('.get_ident_for() must be overridden')
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if isinstance(scope, dict):
+            scope = scope.get(request.method)
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if scope and f'{scope}.{self.kind}' in rates:
+            return f'{scope}.{self.kind}'
+        return self.kind if self.kind in rates else None
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        if self.scope is None:
+            return True
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.num_requests is None:
+            return True
+
+        self.key = self.cache_format % {'scope': self.scope, 'ident': self.get_ident_for(request)}
+        refill_rate = self.num_requests / self.duration
+        lock_key = f'{self.key}_lock'
+        if self.acquire_lock(lock_key):
+            try:
+                self.now = self.timer()
+                tokens, updated_at = self.cache.get(self.key, (self.num_requests, self.now))
+                tokens = min(self.num_requests, tokens + (self.now - updated_at) * refill_rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self.cache.set(self.key, (tokens, self.now), self.duration)
+            finally:
+                self.cache.delete(lock_key)
+            self.wait_time = 0 if allowed else (1 - tokens) / refill_rate
+        else:
+            allowed, tokens = False, 0
+            self.wait_time = 1 / refill_rate
+        self.tokens = tokens
+
+        status = {'scope': self.scope, 'limit': self.num_requests, 'remaining': int(tokens)}
+        request._request.rate_limits = getattr(request._request, 'rate_limits', []) + [status]
+        if not allowed:
+            logger.warning('Throttled %s for %s, retry in %.1fs', self.scope, self.key, self.wait_time)
+        return allowed
+
+    def acquire_lock(self, lock_key):
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.lock_poll_interval)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """По пользователю; для анонимных запросов — по IP."""
+    kind = 'user'
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """По IP-адресу клиента независимо от аутентификации."""
+    kind = 'ip'
+
+    def get_ident_for(self, request):
+        return self.get_ident(request)
+
+
+@contextmanager
+def outbound_fetch_slot():
+    """
+    Занимает слот для исходящего запроса fetch_link_data.
+
+    Счётчик одновременных запросов хранится в кеше Django и общий для всех
+    процессов при разделяемом кеше. Если слотов нет, сразу выбрасывает
+    Throttled (429 с Retry-After) вместо ожидания в очереди.
+    """
+    limit = getattr(settings, 'OUTBOUND_FETCH_MAX_CONCURRENCY', 20)
+    # TTL страхует от "утечки" слотов, если процесс упал посреди запроса.
+    ttl = getattr(settings, 'OUTBOUND_FETCH_SLOT_TTL', 60)
+    cache.add(OUTBOUND_FETCH_KEY, 0, ttl)
+    try:
+        in_flight = cache.incr(OUTBOUND_FETCH_KEY)
+    except ValueError:
+        # Ключ истёк между add() и incr().
+        cache.add(OUTBOUND_FETCH_KEY, 0, ttl)
+        in_flight = cache.incr(OUTBOUND_FETCH_KEY)
+    # incr() не продлевает срок жизни ключа: без touch() счётчик под нагрузкой
+    # истекал бы посреди запросов и обнулялся, пропуская вдвое больше лимита.
+    cache.touch(OUTBOUND_FETCH_KEY, ttl)
+
+    if in_flight > limit:
+        release_outbound_fetch_slot()
+        wait = getattr(settings, 'OUTBOUND_FETCH_RETRY_AFTER', 5)
+        logger.warning('Outbound fetch capacity exhausted (%s in flight), retry in %ss', in_flight - 1, wait)
+        raise Throttled(wait=wait, detail='Too many link previews are being fetched, try again later.')
+    try:
+        yield
+    finally:
+        release_outbound_fetch_slot()
+
+
+def release_outbound_fetch_slot():
+    try:
+        if cache.decr(OUTBOUND_FETCH_KEY) < 0:
+            cache.set(OUTBOUND_FETCH_KEY, 0, getattr(settings, 'OUTBOUND_FETCH_SLOT_TTL', 60))
+    except ValueError:
+        pass
+
+
+def outbound_fetches_in_flight():
+    return max(cache.get(OUTBOUND_FETCH_KEY, 0), 0)
@@ -1,6 +1,38 @@
+from urllib.parse import urlsplit, urlunsplit
+
 import requests
 from bs4 import BeautifulSoup
 
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Приводит URL к каноническому виду для сравнения: схема и хост в нижнем
+    регистре, без порта по умолчанию и фрагмента, пустой путь заменяется на '/'.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname
+    if ':' in netloc:
+        netloc = f'[{netloc}]'
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        netloc = f'{userinfo}@{netloc}'
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
 def fetch_link_data(url):
     data = {
         'title': '',
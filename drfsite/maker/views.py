@@ -1,13 +1,22 @@
+import io
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Prefetch
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Link, Collection
-from .serializers import LinkSerializer, CollectionSerializer
+from .models import ChangeLog, Link, Collection
+from .serializers import LinkSerializer, CollectionSerializer, CollectionSummarySerializer
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
-from .utils import fetch_link_data
+from .provisioning import Provisioner, detect_format, read_rows, request_hash_limit
+from .throttling import outbound_fetch_slot, outbound_fetches_in_flight
+from .utils import fetch_link_data, normalize_url
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -21,6 +30,8 @@ User = get_user_model()
 
 
 class RegisterView(APIView):
+    throttle_scope = 'register'
+
     @swagger_auto_schema(
         operation_summary="Регистрация нового пользователя",
         operation_description="Эндпоинт для регистрации нового пользователя. Требуются обязательные поля: username, email, password.",
@@ -41,7 +52,7 @@ class RegisterView(APIView):
             }),
             400: openapi.Response(description="Некорректные данные", examples={
                 "application/json": {
-                    "error": "Пользователь с таким username уже существует."
+                    "error": "Пользователь с таким username или email уже существует."
                 }
             }),
         }
@@ -54,14 +65,105 @@ class RegisterView(APIView):
         if not username or not email or not password:
             raise ValidationError("Пожалуйста, заполните все поля: username, email, password.")
 
-        if User.objects.filter(username=username).exists():
-            raise ValidationError("Пользователь с таким username уже существует.")
-
-        user = User.objects.create_user(username=username, email=email, password=password)
+        # Уникальность проверяет сама БД: отдельный exists() перед вставкой не нужен.
+        try:
+            with transaction.atomic():
+                User.objects.create_user(username=username, email=email, password=password)
+        except IntegrityError:
+            raise ValidationError("Пользователь с таким username или email уже существует.")
         return Response({"message": "Пользователь успешно зарегистрирован."}, status=status.HTTP_201_CREATED)
 
 
+class UserProvisioningView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Массовое создание пользователей",
+        operation_description=(
+            "Только для администраторов. Принимает файл `file` (CSV с заголовком или NDJSON) "
+            "либо JSON `{\"users\": [...]}`. Поля строки: username, email, password или готовый "
+            "password_hash, опционально first_name, last_name. За один запрос обрабатывается "
+            "не больше PROVISIONING_MAX_ROWS_PER_REQUEST строк начиная со `start`, а строк с "
+            "открытым паролем — столько, сколько успеет захешироваться за "
+            "PROVISIONING_REQUEST_TIME_BUDGET секунд (около сотни для PBKDF2); "
+            "продолжить можно с `next_row` из ответа, пока `done` не станет true. "
+            "Существующие пользователи пропускаются. Большие файлы с открытыми паролями "
+            "загружайте командой provision_users."
+        ),
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='С какой строки начать'),
+        ],
+        responses={
+            200: openapi.Response(description="Результат загрузки", examples={
+                "application/json": {
+                    "created": 998, "skipped": 1, "errors": [{"row": 17, "error": "username and email are required."}],
+                    "next_row": 1000, "done": True,
+                }
+            }),
+            400: openapi.Response(description="Нет данных или неверный формат"),
+        }
+    )
+    def post(self, request):
+        try:
+            start = int(request.query_params.get('start', 0))
+        except ValueError:
+            return Response({"error": "start must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if start < 0:
+            return Response({"error": "start must be non-negative."}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            fmt = request.data.get('format') or detect_format(upload.name)
+            if fmt not in ('csv', 'ndjson'):
+                return Response({"error": "format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+            # Декодируем сразу: read_rows ленивый, и ошибка кодировки всплыла бы посреди загрузки.
+            try:
+                content = upload.read().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                return Response({"error": "File must be UTF-8 encoded."}, status=status.HTTP_400_BAD_REQUEST)
+            rows = read_rows(io.StringIO(content), fmt)
+        elif isinstance(request.data.get('users'), list):
+            rows = request.data['users']
+        else:
+            return Response({"error": "Upload a file or pass a users list."}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = getattr(settings, 'PROVISIONING_MAX_ROWS_PER_REQUEST', 5000)
+        # Пул процессов внутри запроса многопоточного сервера не поднимаем: хешируем в текущем
+        # потоке, поэтому число открытых паролей ограничено бюджетом времени на запрос.
+        with Provisioner(workers=1) as provisioner:
+            stats = provisioner.run(rows, start=start, limit=limit, max_hashes=request_hash_limit())
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class ThrottlingStatusView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Состояние ограничений запросов",
+        operation_description="Только для администраторов. Настроенные ставки и число исходящих запросов fetch_link_data в работе.",
+        responses={
+            200: openapi.Response(description="Состояние ограничений", examples={
+                "application/json": {
+                    "rates": {"user": "1000/hour", "auth.ip": "10/min"},
+                    "outbound_fetch": {"in_flight": 3, "limit": 20},
+                }
+            }),
+        }
+    )
+    def get(self, request):
+        return Response({
+            "rates": api_settings.DEFAULT_THROTTLE_RATES,
+            "outbound_fetch": {
+                "in_flight": outbound_fetches_in_flight(),
+                "limit": getattr(settings, 'OUTBOUND_FETCH_MAX_CONCURRENCY', 20),
+            },
+        }, status=status.HTTP_200_OK)
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
+    throttle_scope = 'auth'
+
     @swagger_auto_schema(
         operation_summary="Получить токены (логин пользователя)",
         operation_description="Эндпоинт для аутентификации пользователя. Возвращает `access` и `refresh` токены.",
@@ -137,7 +239,8 @@ class ChangePasswordView(APIView):
 
 
 class PasswordResetView(APIView):
-    
+    throttle_scope = 'password_reset'
+
     @swagger_auto_schema(
         operation_summary="Запрос на сброс пароля",
         operation_description="Отправляет ссылку для сброса пароля на указанный email.",
@@ -218,6 +321,7 @@ class PasswordResetConfirmView(APIView):
 
 class LinkView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = {'POST': 'link_create'}
 
     @swagger_auto_schema(
         operation_summary="Получить все ссылки пользователя",
@@ -244,14 +348,18 @@ class LinkView(APIView):
         responses={
             201: LinkSerializer,
             400: 'Bad Request',
+            429: 'Too Many Requests',
         },
     )
     def post(self, request):
         url = request.data.get('url')
         if not url:
             return Response({"error": "URL is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(url, str):
+            return Response({"error": "URL must be a string."}, status=status.HTTP_400_BAD_REQUEST)
 
-        link_data = fetch_link_data(url)
+        with outbound_fetch_slot():
+            link_data = fetch_link_data(normalize_url(url))
         link = Link.objects.create(
             user=request.user,
             title=link_data['title'],
@@ -336,6 +444,70 @@ class LinkView(APIView):
         return Response({"message": "Ссылка успешно удалена."}, status=status.HTTP_204_NO_CONTENT)
 
 
+class LinkLookupView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_URLS = 1000
+
+    @swagger_auto_schema(
+        operation_summary="Проверить, сохранены ли ссылки",
+        operation_description=(
+            "Пакетная проверка списка URL. URL нормализуются и ищутся одним запросом "
+            "среди ссылок пользователя. Для найденных возвращаются id ссылки и id коллекций."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'urls': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
+                    description=f'Список URL (не более {MAX_URLS})'
+                ),
+            },
+            required=['urls']
+        ),
+        responses={
+            200: openapi.Response(description="Результат проверки", examples={
+                "application/json": {
+                    "found": {"https://example.com/": {"id": 1, "collections": [2, 5]}},
+                    "missing": ["https://example.org/"],
+                }
+            }),
+            400: openapi.Response(description="Ошибка валидации"),
+        }
+    )
+    def post(self, request):
+        urls = request.data.get('urls')
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            return Response({"error": "urls must be a list of strings."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(urls) > self.MAX_URLS:
+            return Response({"error": f"At most {self.MAX_URLS} urls per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        normalized = {url: normalize_url(url) for url in urls}
+        # Ищем и по исходному виду: ссылки, сохранённые до нормализации, хранятся как есть.
+        candidates = set(normalized) | set(normalized.values())
+        matches = dict(
+            Link.objects.filter(user=request.user, url__in=candidates).values_list('url', 'id')
+        )
+
+        memberships = {}
+        if matches:
+            pairs = Collection.links.through.objects.filter(
+                link_id__in=matches.values(), collection__user=request.user
+            ).values_list('link_id', 'collection_id')
+            for link_id, collection_id in pairs:
+                memberships.setdefault(link_id, []).append(collection_id)
+
+        found, missing = {}, []
+        for url, normalized_url in normalized.items():
+            link_id = matches.get(normalized_url, matches.get(url))
+            if link_id is None:
+                missing.append(url)
+            else:
+                found[url] = {"id": link_id, "collections": memberships.get(link_id, [])}
+
+        return Response({"found": found, "missing": missing}, status=status.HTTP_200_OK)
+
+
 class CollectionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -346,7 +518,7 @@ class CollectionView(APIView):
         },
     )
     def get(self, request):
-        collections = Collection.objects.filter(user=request.user)
+        collections = Collection.objects.filter(user=request.user).prefetch_related('links')
         serializer = CollectionSerializer(collections, many=True)
         return Response(serializer.data)
 
@@ -448,3 +620,165 @@ class CollectionView(APIView):
         collection = get_object_or_404(Collection, pk=pk, user=request.user)
         collection.delete()
         return Response({"message": "Коллекция успешно удалена."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class CollectionSummaryView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_PREVIEWS = 3
+    MAX_PREVIEWS = 10
+
+    @swagger_auto_schema(
+        operation_summary="Получить сводку по коллекциям пользователя",
+        operation_description=(
+            "Для каждой коллекции возвращает количество ссылок, время последнего изменения "
+            "(коллекции или её ссылок) и превью первых `previews` ссылок. "
+            "Выполняется фиксированным числом запросов независимо от числа коллекций."
+        ),
+        manual_parameters=[
+            openapi.Parameter('previews', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f'Сколько превью ссылок вернуть (0-{MAX_PREVIEWS})'),
+        ],
+        responses={
+            200: openapi.Response('Сводка по коллекциям', CollectionSummarySerializer(many=True)),
+            400: openapi.Response(description="Некорректный параметр previews"),
+        },
+    )
+    def get(self, request):
+        try:
+            previews = int(request.query_params.get('previews', self.DEFAULT_PREVIEWS))
+        except ValueError:
+            return Response({"error": "previews must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        previews = max(0, min(previews, self.MAX_PREVIEWS))
+
+        # Срез внутри Prefetch Django выполняет одним запросом с ROW_NUMBER() по коллекциям.
+        preview_links = Link.objects.only('id', 'title', 'image').order_by('-created_at', '-id')[:previews]
+        collections = (
+            Collection.objects.filter(user=request.user)
+            .annotate(
+                link_count=Count('links'),
+                last_updated=Greatest('updated_at', Coalesce(Max('links__updated_at'), F('updated_at'))),
+            )
+            .prefetch_related(Prefetch('links', queryset=preview_links, to_attr='preview_links'))
+            .order_by('-last_updated')
+        )
+        serializer = CollectionSummarySerializer(collections, many=True)
+        return Response(serializer.data)
+
+
+class SyncView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_LIMIT = 500
+    MAX_LIMIT = 1000
+    # Курсор сравнивается с BIGINT id; большее значение база не примет.
+    MAX_CURSOR = 2 ** 63 - 1
+
+    @swagger_auto_schema(
+        operation_summary="Получить изменения с момента курсора",
+        operation_description=(
+            "Инкрементальная синхронизация ссылок, коллекций и их связей. "
+            "Без `cursor` возвращает полный снимок и текущий курсор. "
+            "Если курсор старше очищенной части журнала, возвращается 410 и клиент должен "
+            "выполнить полную синхронизацию."
+        ),
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Курсор из предыдущего ответа'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Максимум записей журнала за один ответ'),
+        ],
+        responses={
+            200: openapi.Response(description="Изменения с момента курсора", examples={
+                "application/json": {
+                    "cursor": 42,
+                    "has_more": False,
+                    "links": {"upserted": [], "deleted": [7]},
+                    "collections": {"upserted": [], "deleted": []},
+                    "memberships": {"added": [[3, 8]], "removed": []},
+                }
+            }),
+            400: openapi.Response(description="Некорректный курсор или limit"),
+            410: openapi.Response(description="Курсор устарел, нужна полная синхронизация"),
+        }
+    )
+    def get(self, request):
+        if 'cursor' not in request.query_params:
+            return Response(self.snapshot(request.user))
+
+        try:
+            cursor = int(request.query_params['cursor'])
+            limit = int(request.query_params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "cursor and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= cursor <= self.MAX_CURSOR or limit < 1:
+            return Response({"error": "cursor must be non-negative and limit positive."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, self.MAX_LIMIT)
+
+        # compact_changelog удаляет префикс журнала и всегда оставляет последнюю запись,
+        # поэтому всё, что старше минимального id, уже потеряно.
+        # MIN/MAX по первичному ключу SQLite берёт из края индекса, без сканирования.
+        oldest = ChangeLog.objects.aggregate(oldest=Min('id'))['oldest']
+        if oldest is not None and cursor < oldest - 1:
+            return Response({"error": "Cursor is too old, full sync required."}, status=status.HTTP_410_GONE)
+
+        entries = list(
+            ChangeLog.objects.filter(user=request.user, id__gt=cursor)
+            .order_by('id')
+            .values_list('id', 'entity', 'action', 'object_id', 'collection_id')[:limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        # Схлопываем историю: для каждого объекта важно только последнее действие.
+        links, collections, memberships = {}, {}, {}
+        for _, entity, action, object_id, collection_id in entries:
+            if entity == ChangeLog.ENTITY_LINK:
+                links[object_id] = action
+            elif entity == ChangeLog.ENTITY_COLLECTION:
+                collections[object_id] = action
+            else:
+                memberships[(collection_id, object_id)] = action
+
+        next_cursor = entries[-1][0] if entries else cursor
+        return Response(self.build_response(request.user, next_cursor, has_more, links, collections, memberships))
+
+    def build_response(self, user, cursor, has_more, links, collections, memberships):
+        deleted = ChangeLog.ACTION_DELETED
+        upserted_links = Link.objects.filter(
+            user=user, id__in=[pk for pk, action in links.items() if action != deleted]
+        )
+        upserted_collections = Collection.objects.filter(
+            user=user, id__in=[pk for pk, action in collections.items() if action != deleted]
+        ).prefetch_related('links')
+        return {
+            "cursor": cursor,
+            "has_more": has_more,
+            "links": {
+                "upserted": LinkSerializer(upserted_links, many=True).data,
+                "deleted": [pk for pk, action in links.items() if action == deleted],
+            },
+            "collections": {
+                "upserted": CollectionSerializer(upserted_collections, many=True).data,
+                "deleted": [pk for pk, action in collections.items() if action == deleted],
+            },
+            "memberships": {
+                "added": [list(pair) for pair, action in memberships.items() if action != deleted],
+                "removed": [list(pair) for pair, action in memberships.items() if action == deleted],
+            },
+        }
+
+    def snapshot(self, user):
+        # Курсор берём до чтения данных: изменения, попавшие между запросами,
+        # придут повторно при следующей синхронизации, а не потеряются.
+        cursor = ChangeLog.objects.aggregate(latest=Max('id'))['latest'] or 0
+        links = Link.objects.filter(user=user)
+        collections = Collection.objects.filter(user=user).prefetch_related('links')
+        memberships = Collection.links.through.objects.filter(collection__user=user)
+        return {
+            "cursor": cursor,
+            "has_more": False,
+            "links": {"upserted": LinkSerializer(links, many=True).data, "deleted": []},
+            "collections": {"upserted": CollectionSerializer(collections, many=True).data, "deleted": []},
+            "memberships": {
+                "added": [list(pair) for pair in memberships.values_list('collection_id', 'link_id')],
+                "removed": [],
+            },
+        }